@@ -4,9 +4,10 @@
 import asyncio
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from motor.motor_asyncio import AsyncIOMotorClient
+from mongojet import create_client
 from telegram.error import TimedOut, NetworkError
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler
+from telegram.request import HTTPXRequest
 from watcher_config import Config
 from watcher_database import DatabaseOperations
 from watcher_scheduler import Scheduler
@@ -17,7 +18,14 @@ logger = logging.getLogger(__name__)
 
 async def initialize_application(config: Config, db_ops: DatabaseOperations) -> Application:
     """Initialize and configure the Telegram bot application."""
-    application = Application.builder().token(config.telegram_api_bot_api_key_2).read_timeout(30).build()
+    request = HTTPXRequest(
+        connection_pool_size=16,
+        pool_timeout=5,
+        connect_timeout=5,
+        write_timeout=30,
+        read_timeout=30
+    )
+    application = Application.builder().token(config.telegram_api_bot_api_key_2).request(request).build()
     application.bot_data['config'] = config
     application.bot_data['db_ops'] = db_ops
     application.bot_data['admin_id'] = int(config.telegram_api_chat_id)
@@ -45,10 +53,11 @@ async def setup_scheduler(config: Config, db_ops: DatabaseOperations) -> AsyncIO
 
 async def run_main_loop() -> None:
     """Main application loop."""
+    mongo_client = None
     try:
         # Initialize MongoDB client and database
-        mongo_client = AsyncIOMotorClient("mongodb://localhost:27017")
-        db = mongo_client['watcher']
+        mongo_client = await create_client("mongodb://localhost:27017/watcher?maxPoolSize=16")
+        db = mongo_client.get_database('watcher')
 
         # Initialize configuration
         config = Config(db)
@@ -56,7 +65,11 @@ async def run_main_loop() -> None:
         logger.info("Config initialized")
 
         # Initialize database operations
-        db_ops = DatabaseOperations(db)
+        db_ops = DatabaseOperations(db, ttl=config.report_scan / 2)
+        await db_ops.ensure_indexes()
+
+        # Pooled SOCKS5 connections should survive the gap between collect cycles
+        Requests.set_keepalive(config.report_scan)
 
         await Requests.send_message(config, f"<code>В сети</code>")
 
@@ -76,16 +89,16 @@ async def run_main_loop() -> None:
         scheduler = await setup_scheduler(config, db_ops)
         scheduler.start()
 
-        # Keep the application running
+        # Keep the application running; periodic work is driven by the scheduler
         await asyncio.Event().wait()
 
-        # Periodic tasks
-        while True:
-            await asyncio.sleep(config.report_scan)
-
     except Exception as e:
         logger.error(f"Error in main loop: {e}")
         raise
+    finally:
+        await Requests.close_sessions()
+        if mongo_client is not None:
+            await mongo_client.close()
 
 if __name__ == "__main__":
     """The entry point for the script."""
@@ -1,24 +1,49 @@
 # -*- coding: utf-8 -*-
 
 import os
+import base64
+import asyncio
 import logging
+from collections import defaultdict
 from typing import Dict, List, Union, Optional, Any
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
-from motor.motor_asyncio import AsyncIOMotorClient
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from mongojet import Database
 
 logger = logging.getLogger(__name__)
 
+FERNET_VERSION = b'\x80'
+AESGCM_VERSION = b'\x81'
+AESGCM_NONCE_SIZE = 12
+AESGCM_KEY_INFO = b'watcher-config-aesgcm'
+
+# Secret fields per config document; '*' walks every element of a list
+ENCRYPTED_FIELDS = {
+    "socks5": [("ip",), ("port",), ("username",), ("password",)],
+    "telegram": [
+        ("client", "api_id"),
+        ("client", "api_hash"),
+        ("client", "commandor"),
+        ("api", "chat_id"),
+        ("api", "bot", "*", "api_key")
+    ],
+    "toolchain": [("ether", "api_key", "*")]
+}
+
 class Config:
     """
     Configuration class to initialize and manage application settings.
     """
 
-    def __init__(self, db: AsyncIOMotorClient) -> None:
+    def __init__(self, db: Database) -> None:
         """
         Initialize the configuration with database connection.
         
         Args:
-            db (AsyncIOMotorClient): The MongoDB client instance.
+            db (Database): The MongoDB database instance.
         """
         self.db = db
         self.report_min_lim: Optional[float] = None
@@ -29,6 +54,7 @@ class Config:
         self.socks5_port: Optional[int] = None
         self.socks5_username: Optional[str] = None
         self.socks5_password: Optional[str] = None
+        self.socks5_url: Optional[str] = None
         self.telegram_url: Optional[str] = None
         self.telegram_client_api_id: Optional[str] = None
         self.telegram_client_api_hash: Optional[str] = None
@@ -38,13 +64,18 @@ class Config:
         self.telegram_api_bot_api_key_1: Optional[str] = None
         self.telegram_api_bot_name_2: Optional[str] = None
         self.telegram_api_bot_api_key_2: Optional[str] = None
+        self.telegram_send_message_url: Optional[str] = None
+        self.telegram_send_document_url: Optional[str] = None
         self.toolchain_geco_url: Optional[str] = None
         self.toolchain_ether_url: Optional[str] = None
         self.toolchain_ether_chain: Optional[str] = None
         self.toolchain_ether_address: Optional[str] = None
         self.toolchain_ether_api_key_1: Optional[str] = None
         self.toolchain_ether_api_key_2: Optional[str] = None
+        self.toolchain_ether_gas_oracle_url: Optional[str] = None
         self.token: List[Dict[str, Union[str, float, int]]] = []
+        self.tokens_by_chain: Dict[str, List[str]] = {}
+        self.tokens_by_address: Dict[str, Dict[str, Union[str, float, int]]] = {}
 
         # Read the encryption key from environment variable
         self.key = os.environ.get('ENCRYPTION_KEY')
@@ -52,28 +83,37 @@ class Config:
             raise ValueError("ENCRYPTION_KEY environment variable not set")
 
         self.cipher_suite = Fernet(self.key.encode())
-        
+        # Derive a separate AES-GCM key; the raw Fernet key also serves as its HMAC key
+        hkdf = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=AESGCM_KEY_INFO)
+        self._aead = AESGCM(hkdf.derive(base64.urlsafe_b64decode(self.key.encode())))
+
     def encrypt_data(self, data: str) -> str:
         """Encrypts data"""
         try:
-            return self.cipher_suite.encrypt(data.encode()).decode()
+            nonce = os.urandom(AESGCM_NONCE_SIZE)
+            token = AESGCM_VERSION + nonce + self._aead.encrypt(nonce, data.encode(), None)
+            return base64.urlsafe_b64encode(token).decode()
         except (TypeError, ValueError) as e:
             raise ValueError(f"Error encrypting data")
 
     def decrypt_data(self, encrypted_data: str) -> str:
-        """Decrypts data"""
+        """Decrypts data, accepting both AES-GCM and legacy Fernet tokens"""
         try:
+            token = base64.urlsafe_b64decode(encrypted_data.encode())
+            if token[:1] == AESGCM_VERSION:
+                nonce = token[1:1 + AESGCM_NONCE_SIZE]
+                return self._aead.decrypt(nonce, token[1 + AESGCM_NONCE_SIZE:], None).decode()
             return self.cipher_suite.decrypt(encrypted_data.encode()).decode()
-        except (InvalidToken, TypeError, ValueError) as e:
+        except (InvalidTag, InvalidToken, TypeError, ValueError) as e:
             raise ValueError(f"Error decrypting data")
 
-    def is_encrypted(self, data: str) -> bool:
-        """Checks if data is encrypted"""
+    @staticmethod
+    def token_version(data: str) -> bytes:
+        """Returns the version byte of a token, or b'' if data is not base64"""
         try:
-            self.cipher_suite.decrypt(data.encode())
-            return True
-        except InvalidToken:
-            return False
+            return base64.urlsafe_b64decode(data.encode())[:1]
+        except (TypeError, ValueError):
+            return b''
 
     def convert_to_string(self, data: Any) -> str:
         """Converts data to string"""
@@ -82,91 +122,86 @@ class Config:
         except Exception as e:
             logger.error(f"Unexpected error in convert_to_string")
 
+    @staticmethod
+    def _walk_fields(data: Any, path: tuple, prefix: str = "") -> List[tuple]:
+        """Returns (container, key, dotted path) for every existing field matching path"""
+        key, rest = path[0], path[1:]
+        if key == "*":
+            keys = range(len(data)) if isinstance(data, list) else []
+        else:
+            keys = [key] if isinstance(data, dict) and key in data else []
+
+        if not rest:
+            return [(data, k, f"{prefix}{k}") for k in keys]
+        return [triple for k in keys for triple in Config._walk_fields(data[k], rest, f"{prefix}{k}.")]
+
+    def _process_encrypted(self, doc: Dict[str, Any], spec: List[tuple]) -> Dict[str, Any]:
+        """Decrypts the fields of a document in place, encrypting plaintext and Fernet ones; returns the $set to persist"""
+        changes: Dict[str, Any] = {}
+        encrypted = doc.get("_encrypted")
+        for path in spec:
+            for container, key, field in self._walk_fields(doc, path):
+                value = self.convert_to_string(container[key])
+                try:
+                    container[key] = self.decrypt_data(value)
+                except ValueError:
+                    # A token in an encrypted document that fails to decrypt is not plaintext; never re-encrypt it
+                    if encrypted and self.token_version(value) in (FERNET_VERSION, AESGCM_VERSION):
+                        raise ValueError(f"Cannot decrypt {field}; was ENCRYPTION_KEY changed?")
+                    changes[field] = self.encrypt_data(value)
+                    container[key] = value
+                else:
+                    if self.token_version(value) == FERNET_VERSION:
+                        changes[field] = self.encrypt_data(container[key])
+
+        if not encrypted:
+            changes["_encrypted"] = True
+        return changes
+
     async def init_config(self) -> None:
         """Asynchronously initialize the configuration by fetching data from the database"""
         try:
             c_config = self.db.config
+            docs = {
+                doc["_id"]: doc
+                for doc in await c_config.find_many({"_id": {"$in": ["report", "socks5", "telegram", "toolchain", "tokens"]}})
+            }
+            updates = []
 
             # Report
             try:
-                report_data = await c_config.find_one({"_id": "report"})
+                report_data = docs.get("report")
                 if report_data:
                     self.report_min_lim = report_data.get("min_lim")
                     self.report_max_lim = report_data.get("max_lim")
                     self.report_interval = report_data.get("interval")
                     self.report_scan = report_data.get("scan")
             except Exception as e:
-                print(f"Error fetching report data")
+                logger.exception("Error fetching report data")
 
             # Socks5
             try:
-                socks5_data = await c_config.find_one({"_id": "socks5"})
+                socks5_data = docs.get("socks5")
                 if socks5_data:
+                    changes = self._process_encrypted(socks5_data, ENCRYPTED_FIELDS["socks5"])
+                    if changes:
+                        updates.append(c_config.update_one({'_id': 'socks5'}, {'$set': changes}))
+
                     self.socks5_ip = socks5_data.get("ip")
-                    self.socks5_port = socks5_data.get("port")
+                    self.socks5_port = int(socks5_data.get("port"))
                     self.socks5_username = socks5_data.get("username")
                     self.socks5_password = socks5_data.get("password")
-
-                    # Encrypt data if not already encrypted
-                    for key in ['ip', 'port', 'username', 'password']:
-                        if not self.is_encrypted(self.convert_to_string(socks5_data[key])):
-                            socks5_data[key] = self.encrypt_data(self.convert_to_string(socks5_data[key]))
-                    await c_config.update_one({'_id': 'socks5'}, {'$set': socks5_data})
-
-                    # Decrypt data
-                    self.socks5_ip = self.decrypt_data(socks5_data.get("ip"))
-                    self.socks5_port = int(self.decrypt_data(socks5_data.get("port")))
-                    self.socks5_username = self.decrypt_data(socks5_data.get("username"))
-                    self.socks5_password = self.decrypt_data(socks5_data.get("password"))
+                    self.socks5_url = f"socks5://{self.socks5_username}:{self.socks5_password}@{self.socks5_ip}:{self.socks5_port}"
             except Exception as e:
-                print(f"Error fetching or processing socks5 data")
+                logger.exception("Error fetching or processing socks5 data")
 
             # Telegram
             try:
-                telegram_data = await c_config.find_one({"_id": "telegram"})
+                telegram_data = docs.get("telegram")
                 if telegram_data:
-                    encrypted = False
-                    # Encrypt data if not already encrypted
-                    if "client" in telegram_data:
-                        client_data = telegram_data["client"]
-                        for key in ["api_id", "api_hash", "commandor"]:
-                            if key in client_data and not self.is_encrypted(self.convert_to_string(client_data[key])):
-                                client_data[key] = self.encrypt_data(self.convert_to_string(client_data[key]))
-                                encrypted = True
-
-                    if "api" in telegram_data:
-                        api_data = telegram_data["api"]
-                        if "chat_id" in api_data and not self.is_encrypted(self.convert_to_string(api_data["chat_id"])):
-                            api_data["chat_id"] = self.encrypt_data(self.convert_to_string(api_data["chat_id"]))
-                            encrypted = True
-
-                        if "bot" in api_data:
-                            bots_data = api_data["bot"]
-                            for bot in bots_data:
-                                if "api_key" in bot and not self.is_encrypted(self.convert_to_string(bot["api_key"])):
-                                    bot["api_key"] = self.encrypt_data(self.convert_to_string(bot["api_key"]))
-                                    encrypted = True
-
-                    if encrypted:
-                        await c_config.update_one({'_id': 'telegram'}, {'$set': telegram_data})
-
-                    # Decrypt data
-                    if "client" in telegram_data:
-                        client_data = telegram_data["client"]
-                        for key in ["api_id", "api_hash", "commandor"]:
-                            if key in client_data:
-                                client_data[key] = self.decrypt_data(client_data[key])
-
-                    if "api" in telegram_data:
-                        api_data = telegram_data["api"]
-                        if "chat_id" in api_data:
-                            api_data["chat_id"] = self.decrypt_data(api_data["chat_id"])
-
-                        if "bot" in api_data:
-                            bots_data = api_data["bot"]
-                            for bot in bots_data:
-                                if "api_key" in bot:
-                                    bot["api_key"] = self.decrypt_data(bot["api_key"])
+                    changes = self._process_encrypted(telegram_data, ENCRYPTED_FIELDS["telegram"])
+                    if changes:
+                        updates.append(c_config.update_one({'_id': 'telegram'}, {'$set': changes}))
 
                     self.telegram_url = telegram_data.get("url")
                     self.telegram_client_api_id = telegram_data["client"].get("api_id")
@@ -177,33 +212,18 @@ class Config:
                     self.telegram_api_bot_api_key_1 = telegram_data["api"]["bot"][0].get("api_key")
                     self.telegram_api_bot_name_2 = telegram_data["api"]["bot"][1].get("name")
                     self.telegram_api_bot_api_key_2 = telegram_data["api"]["bot"][1].get("api_key")
+                    self.telegram_send_message_url = f"{self.telegram_url}/bot{self.telegram_api_bot_api_key_2}/sendMessage"
+                    self.telegram_send_document_url = f"{self.telegram_url}/bot{self.telegram_api_bot_api_key_2}/sendDocument"
             except Exception as e:
-                print(f"Error fetching or processing telegram data")
+                logger.exception("Error fetching or processing telegram data")
 
             # Toolchain
             try:
-                toolchain_data = await c_config.find_one({"_id": "toolchain"})
+                toolchain_data = docs.get("toolchain")
                 if toolchain_data:
-                    encrypted = False
-                    if "ether" in toolchain_data:
-                        ether_data = toolchain_data["ether"]
-                        if "api_key" in ether_data:
-                            api_key_data = ether_data["api_key"]
-                            for i, key in enumerate(api_key_data):
-                                if not self.is_encrypted(self.convert_to_string(key)):
-                                    api_key_data[i] = self.encrypt_data(self.convert_to_string(key))
-                                    encrypted = True
-
-                    if encrypted:
-                        await c_config.update_one({'_id': 'toolchain'}, {'$set': toolchain_data})
-
-                    # Decrypt data
-                    if "ether" in toolchain_data:
-                        ether_data = toolchain_data["ether"]
-                        if "api_key" in ether_data:
-                            api_key_data = ether_data["api_key"]
-                            for i, key in enumerate(api_key_data):
-                                api_key_data[i] = self.decrypt_data(key)
+                    changes = self._process_encrypted(toolchain_data, ENCRYPTED_FIELDS["toolchain"])
+                    if changes:
+                        updates.append(c_config.update_one({'_id': 'toolchain'}, {'$set': changes}))
 
                     self.toolchain_geco_url = toolchain_data["geco"].get("url")
                     self.toolchain_ether_url = toolchain_data["ether"].get("url")
@@ -211,15 +231,17 @@ class Config:
                     self.toolchain_ether_address = toolchain_data["ether"].get("address")
                     self.toolchain_ether_api_key_1 = toolchain_data["ether"]["api_key"][0]
                     self.toolchain_ether_api_key_2 = toolchain_data["ether"]["api_key"][1]
+                    self.toolchain_ether_gas_oracle_url = f"{self.toolchain_ether_url}?module=gastracker&action=gasoracle&apikey={self.toolchain_ether_api_key_1}"
             except Exception as e:
-                print(f"Error fetching or processing toolchain data")
+                logger.exception("Error fetching or processing toolchain data")
 
             # Tokens
             try:
-                tokens_data = await c_config.find_one({"_id": "tokens"})
+                tokens_data = docs.get("tokens")
                 if tokens_data:
                     token_list = tokens_data.get("token", [])
                     if token_list:
+                        tokens_by_chain: Dict[str, List[str]] = defaultdict(list)
                         for item in token_list:
                             token_info = {
                                 "name": item.get("name"),
@@ -229,8 +251,20 @@ class Config:
                                 "quantity": item.get("quantity")
                             }
                             self.token.append(token_info)
+                            if not token_info["address"]:
+                                logger.warning(f"Token {token_info['name']} has no address; it will not be collected")
+                                continue
+                            tokens_by_chain[token_info["chain"]].append(token_info["address"])
+                            self.tokens_by_address[token_info["address"].lower()] = token_info
+                        self.tokens_by_chain = dict(tokens_by_chain)
             except Exception as e:
-                print(f"Error fetching or processing tokens data")
+                logger.exception("Error fetching or processing tokens data")
+
+            # Write back newly encrypted documents concurrently
+            results = await asyncio.gather(*updates, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error(f"Error saving encrypted config data: {result}")
 
         except Exception as e:
-            logger.error(f"Error in init_config")
\ No newline at end of file
+            logger.exception("Error in init_config")
\ No newline at end of file
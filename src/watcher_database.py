@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import time
 import logging
-from typing import Dict, Any, Optional
-from motor.motor_asyncio import AsyncIOMotorClient
+from typing import Dict, Any, Optional, Tuple
+from mongojet import Database
 
 logger = logging.getLogger(__name__)
 
@@ -11,15 +12,26 @@ class DatabaseOperations:
     A class to handle database operations for storing and retrieving data.
     """
 
-    def __init__(self, db: AsyncIOMotorClient) -> None:
+    def __init__(self, db: Database, ttl: float = 30) -> None:
         """
         Initialize the database operations with the given database connection.
         
         Args:
-            db (AsyncIOMotorClient): The MongoDB client instance.
+            db (Database): The MongoDB database instance.
+            ttl (float): Seconds to serve the latest entry from memory.
         """
         self.db = db
         self.collection = db['data']
+        self.ttl = ttl
+        self._latest_cache: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None
+        self._generation = 0
+
+    async def ensure_indexes(self) -> None:
+        """
+        Create the indexes used by the queries on the data collection.
+        The descending datetime index lets get_latest_entry seek instead of sorting the collection.
+        """
+        await self.collection.create_index([("datetime", -1)])
 
     async def add_entry(self, entry: Dict[str, Any]) -> None:
         """
@@ -28,6 +40,8 @@ class DatabaseOperations:
             entry (Dict[str, Any]): The entry data to be added to the database.
         """
         await self.collection.insert_one(entry)
+        self._generation += 1
+        self._latest_cache = None
 
     async def get_latest_entry(self) -> Optional[Dict[str, Any]]:
         """
@@ -35,7 +49,17 @@ class DatabaseOperations:
         Returns:
             Optional[Dict[str, Any]]: The latest entry data, or None if no entries are found.
         """
-        return await self.collection.find_one(sort=[("datetime", -1)])
+        if self._latest_cache is not None:
+            cached_at, latest = self._latest_cache
+            if time.monotonic() - cached_at < self.ttl:
+                return latest
+
+        generation = self._generation
+        latest = await self.collection.find_one(sort={"datetime": -1})
+        # An add_entry that finished during the read may have made this snapshot stale
+        if generation == self._generation:
+            self._latest_cache = (time.monotonic(), latest)
+        return latest
     
     async def get_latest_gas_price(self) -> Optional[float]:
         """
@@ -54,14 +78,13 @@ class DatabaseOperations:
         Returns:
             float: The total current cost of all tokens.
         """
-        latest = await self.get_latest_entry()
-        latest_entry = latest['tokens']
-
-        total_cur_cost = 0
-        
-        if latest_entry:
-            for token in latest_entry:
-                cur_cost = float(token.get("cur_cost", 0))
-                total_cur_cost += cur_cost
-        
-        return int(total_cur_cost)
\ No newline at end of file
+        pipeline = [
+            {"$sort": {"datetime": -1}},
+            {"$limit": 1},
+            {"$project": {"total": {"$sum": "$tokens.cur_cost"}}}
+        ]
+        cursor = await self.collection.aggregate(pipeline)
+        docs = await cursor.to_list()
+        if docs:
+            return int(docs[0]["total"])
+        return 0
\ No newline at end of file
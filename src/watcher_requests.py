@@ -1,63 +1,99 @@
 # -*- coding: utf-8 -*-
 
+import os
+import random
 import asyncio
 import aiohttp
+import aiofiles
+import orjson
 import logging
 from typing import Dict, Any, List, Optional
 from aiohttp_socks import ProxyConnector
 from watcher_config import Config
+import watcher_utility as Util
 
 logger = logging.getLogger(__name__)
 
+RETRY_DELAY_CAP = 10     # Seconds
+KEEPALIVE_MARGIN = 15    # Seconds idle connections outlive the collect interval
+GAS_GWEI_TO_USD_FACTOR = 3.5619e-4   # 356190 gas units * 1e-9 ETH per gwei
+
 class Requests:
     """
     Class for handling all HTTP requests and Telegram messaging functionality.
     """
-    
+
+    _sessions: Dict[str, aiohttp.ClientSession] = {}
+    keepalive_timeout: float = 60
+
+    @staticmethod
+    def set_keepalive(scan_interval: float) -> None:
+        """Keep idle pooled connections open a little past the collect interval; call before the first request."""
+        Requests.keepalive_timeout = scan_interval + KEEPALIVE_MARGIN
+
+    @staticmethod
+    def get_session(proxy: Optional[str] = None) -> aiohttp.ClientSession:
+        """Return the shared client session for the given proxy, creating it on first use."""
+        key = proxy or ""
+        session = Requests._sessions.get(key)
+        if session is None or session.closed:
+            pool = {'limit': 50, 'limit_per_host': 10, 'keepalive_timeout': Requests.keepalive_timeout}
+            connector = ProxyConnector.from_url(proxy, **pool) if proxy else aiohttp.TCPConnector(**pool)
+            session = aiohttp.ClientSession(connector=connector, json_serialize=lambda v: orjson.dumps(v).decode())
+            Requests._sessions[key] = session
+        return session
+
+    @staticmethod
+    async def close_sessions() -> None:
+        """Close all shared client sessions."""
+        for session in Requests._sessions.values():
+            await session.close()
+        Requests._sessions.clear()
+
     @staticmethod
     async def make_request(method: str, url: str, params: Optional[Dict] = None,
+                         json_body: Optional[Dict] = None,
                          headers: Optional[Dict] = None, files: Optional[Dict] = None,
                          proxy: Optional[str] = None, retries: int = 5, delay: int = 1) -> Optional[Dict[str, Any]]:
         """Perform an HTTP request with retries and error handling."""
-        connector = ProxyConnector.from_url(proxy) if proxy else None
-
-        async with aiohttp.ClientSession(connector=connector, headers=headers) as session:
-            for i in range(retries):
-                try:
-                    if files:
-                        data = aiohttp.FormData()
-                        for key, file in files.items():
-                            data.add_field(key, file, filename=file.name)
-                        async with session.request(method, url, data=data, params=params) as response:
-                            response.raise_for_status()
-                            return await response.json()
-                    else:
-                        async with session.request(method, url, params=params, json=params) as response:
-                            response.raise_for_status()
-                            return await response.json()
-                except aiohttp.ClientResponseError as e:
-                    if e.status in {429, 502}:
-                        logger.error(f"HTTP error {e.status} while making request")
-                        await asyncio.sleep(delay)
-                        delay *= 2
-                    else:
-                        logger.error(f"HTTP error {e.status} while making request")
-                        break
-                except aiohttp.ClientConnectionError as e:
-                    logger.error(f"Connection error while making request")
-                except aiohttp.ClientError as e:
-                    logger.error(f"Unexpected error while making request")
-                except asyncio.TimeoutError:
-                    logger.error("Timeout while making request")
-                except Exception as e:
-                    logger.error(f"Unhandled error while making request")
+        session = Requests.get_session(proxy)
+
+        for i in range(retries):
+            try:
+                if files:
+                    data = aiohttp.FormData()
+                    for key, (filename, content) in files.items():
+                        data.add_field(key, content, filename=filename)
+                    async with session.request(method, url, data=data, params=params, headers=headers) as response:
+                        response.raise_for_status()
+                        return await response.json(loads=orjson.loads)
+                else:
+                    async with session.request(method, url, params=params, json=json_body, headers=headers) as response:
+                        response.raise_for_status()
+                        return await response.json(loads=orjson.loads)
+            except aiohttp.ClientResponseError as e:
+                if e.status in {429, 502}:
+                    logger.error(f"HTTP error {e.status} while making request")
+                    await asyncio.sleep(delay + random.uniform(0, 0.5))
+                    delay = min(delay * 2, RETRY_DELAY_CAP)
+                else:
+                    logger.error(f"HTTP error {e.status} while making request")
                     break
-            return None
+            except aiohttp.ClientConnectionError as e:
+                logger.error(f"Connection error while making request")
+            except aiohttp.ClientError as e:
+                logger.error(f"Unexpected error while making request")
+            except asyncio.TimeoutError:
+                logger.error("Timeout while making request")
+            except Exception as e:
+                logger.error(f"Unhandled error while making request")
+                break
+        return None
 
     @staticmethod
     async def send_message(config: Config, msg: str) -> Optional[Dict[str, Any]]:
         """Send a message to the specified Telegram chat using the bot API."""
-        url = f"{config.telegram_url}/bot{config.telegram_api_bot_api_key_2}/sendMessage"
+        url = config.telegram_send_message_url
         params = {
             'chat_id': config.telegram_api_chat_id,
             'text': msg,
@@ -65,7 +101,7 @@ class Requests:
         }
         try:
             proxy = Util.get_socks5_url(config)
-            return await Requests.make_request(method="POST", url=url, params=params, proxy=proxy)
+            return await Requests.make_request(method="POST", url=url, json_body=params, proxy=proxy)
         except Exception as e:
             logger.error(f"Unhandled error in send_message")
             return None
@@ -74,21 +110,23 @@ class Requests:
     async def send_document(config: Config, file_path: str) -> None:
         """Send a file to the specified Telegram chat using the bot API."""
         try:
-            url = f"{config.telegram_url}/bot{config.telegram_api_bot_api_key_2}/sendDocument"
+            url = config.telegram_send_document_url
             params = {
                 'chat_id': config.telegram_api_chat_id
             }
             proxy = Util.get_socks5_url(config)
 
-            with open(file_path, 'rb') as file:
-                files = {'document': file}
-                response = await Requests.make_request(
-                    method="POST",
-                    url=url,
-                    params=params,
-                    files=files,
-                    proxy=proxy
-                )
+            async with aiofiles.open(file_path, 'rb') as file:
+                content = await file.read()
+
+            files = {'document': (os.path.basename(file_path), content)}
+            response = await Requests.make_request(
+                method="POST",
+                url=url,
+                params=params,
+                files=files,
+                proxy=proxy
+            )
 
             if response:
                 logger.info(f"File {file_path} sent successfully.")
@@ -105,7 +143,7 @@ class Requests:
         if report:
             if len(report) > 0:
                 logger.info(f"Report sent for {len(report)} token[s]")
-                logger.info(f"{json.dumps(report, indent=2, ensure_ascii=False)}")
+                logger.info(orjson.dumps(report, option=orjson.OPT_INDENT_2).decode())
 
             for item in report:
                 report_msg = Util.format_msg_inform(config, item)
@@ -120,30 +158,25 @@ class Requests:
         proxy = Util.get_socks5_url(config)
         all_responses = []
 
-        try:
-            if entry:
-                tasks = []
-                for chain, addresses in entry.items():
-                    address_str = "%2C".join(addresses)
-                    url = f"{config.toolchain_geco_url}/{chain}/tokens/multi/{address_str}"
-                    tasks.append(Requests.make_request(method="GET", url=url, proxy=proxy))
-
-                responses = await asyncio.gather(*tasks, return_exceptions=True)
-                for response in responses:
-                    if isinstance(response, Exception):
-                        logger.error(f"Error fetching data: {response}")
-                    elif response:
-                        all_responses.extend(response.get("data", []))
-            else:
-                url = f"{config.toolchain_ether_url}?module=gastracker&action=gasoracle&apikey={config.toolchain_ether_api_key_1}"
-                response = await Requests.make_request(method="GET", url=url, proxy=proxy)
-                if response:
-                    all_responses.append(response)
+        if entry:
+            tasks = []
+            for chain, addresses in entry.items():
+                address_str = ",".join(addresses)
+                url = f"{config.toolchain_geco_url}/{chain}/tokens/multi/{address_str}"
+                tasks.append(Requests.make_request(method="GET", url=url, proxy=proxy))
+
+            responses = await asyncio.gather(*tasks, return_exceptions=True)
+            for response in responses:
+                if isinstance(response, Exception):
+                    logger.error(f"Error fetching data: {response}")
+                elif response:
+                    all_responses.extend(response.get("data", []))
+        else:
+            response = await Requests.make_request(method="GET", url=config.toolchain_ether_gas_oracle_url, proxy=proxy)
+            if response:
+                all_responses.append(response)
 
-            return all_responses
-        except Exception as e:
-            logger.error(f"Unhandled error in get_token_data")
-            return None
+        return all_responses
 
     @staticmethod
     async def get_gas_price(config: Config) -> Optional[float]:
@@ -175,7 +208,7 @@ class Requests:
             
             price = float(token_data['attributes']['price_usd'])
 
-            gas_price_usd = round(float(gwei * 356190 * 0.000000001 * price), 2)
+            gas_price_usd = round(gwei * GAS_GWEI_TO_USD_FACTOR * price, 2)
             return gas_price_usd
 
         except Exception as e:
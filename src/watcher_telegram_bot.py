@@ -2,7 +2,6 @@
 
 import asyncio
 import logging
-import subprocess
 from typing import Any
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, Update
 from telegram.ext import ContextTypes
@@ -143,11 +142,16 @@ class TelegramBot:
                 await Requests.send_message(context.bot_data['config'], f"<code>Перезапускаю...</code>")
                 logger.info("Attempting to restart the service.")
                 
-                try:
-                    subprocess.run(["sudo", "systemctl", "restart", "watcher.service"], check=True)
-                except subprocess.CalledProcessError as e:
-                    await Requests.send_message(context.bot_data['config'], f"<code>Что-то пошло не так: {e}</code>")
-                    logger.error(f"Error while restarting service: {e}")
+                process = await asyncio.create_subprocess_exec(
+                    "sudo", "systemctl", "restart", "watcher.service",
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    error = stderr.decode(errors='replace').strip()
+                    await Requests.send_message(context.bot_data['config'], f"<code>Что-то пошло не так: {error}</code>")
+                    logger.error(f"Error while restarting service: {error}")
             else:
                 await TelegramBot.notify_admin(update, context)
                 logger.warning(f"Unauthorized access attempt by user ID: {update.effective_chat.id}")
@@ -1,41 +1,19 @@
 # -*- coding: utf-8 -*-
 
+import math
 import time
+import queue
+import atexit
 import logging
-import inspect
+import functools
 from datetime import datetime, timezone, timedelta
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from typing import Any, Dict, List, Union
 
-class FunctionNameFilter(logging.Filter):
-    """
-    A logging filter to add the name of the function where the logging call was made.
-    """
-
-    def filter(self, record: logging.LogRecord) -> bool:
-        """
-        Add the function name to the log record.
-
-        Args:
-            record (logging.LogRecord): The log record to modify.
-
-        Returns:
-            bool: Always returns True to ensure the log record is not filtered out.
-        """
-
-        stack = inspect.stack()
-        for frame_info in stack[2:]:
-            module = inspect.getmodule(frame_info.frame)
-            if module and not module.__name__.startswith('logging'):
-                record.funcName = frame_info.function
-                break
-        else:
-            record.funcName = 'main'
-        return True
-
 def setup_logging(log_file: str, max_bytes: int = 1 * 1024 * 1024, backup_count: int = 5):
     """
     Set up logging with rotating file handler and console handler.
+    Records are queued and written by a background listener thread.
 
     Args:
         log_file (str): The name of the log file.
@@ -57,11 +35,14 @@ def setup_logging(log_file: str, max_bytes: int = 1 * 1024 * 1024, backup_count:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(logging.Formatter(log_format, datefmt=date_format))
 
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+
         logger = logging.getLogger()
         logger.setLevel(logging.INFO)   # DEBUG, INFO, WARNING, ERROR, CRITICAL
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-        logger.addFilter(FunctionNameFilter())
+        logger.addHandler(QueueHandler(log_queue))
         
         logging.getLogger('httpx').setLevel(logging.WARNING)
         logging.getLogger('telegram').setLevel(logging.WARNING)
@@ -70,6 +51,10 @@ def setup_logging(log_file: str, max_bytes: int = 1 * 1024 * 1024, backup_count:
 
 logger = setup_logging("watcher.log")
 
+SUBSCRIPT_MAP = { 1: '₁', 2: '₂', 3: '₃', 4: '₄', 5:  '₅', 6: '₆', 7: '₇', 8: '₈', 9: '₉', 10: '₁₀' }
+SUFFIXES = ["", "K", "M", "B", "T"]
+REPORT_ROW_TEMPLATE = "<code>{char} {name:<8} {pnl:>7}% {cost:>7}$</code>\n"
+
 def get_local_time() -> int:
     """
     Get the current local time in seconds since the Epoch.
@@ -78,33 +63,20 @@ def get_local_time() -> int:
         int: The current local time in seconds since the Epoch.
     """
 
-    try:
-        local_time = int(time.mktime(time.localtime(time.time())))
-        return local_time
-    except Exception as e:
-        logger.error(f"Unexpected error in get_local_time: {e}")
-        return 0
+    return int(time.time())
     
 def get_socks5_url(config: Any) -> str:
     """
-    Generate the SOCKS5 URL from the configuration details.
+    Return the SOCKS5 URL built from the configuration details by Config.init_config.
 
     Args:
         config (Any): The configuration object containing SOCKS5 proxy details.
 
     Returns:
-        str: The generated SOCKS5 URL.
+        str: The SOCKS5 URL.
     """
 
-    try:
-        socks5_url = f"socks5://{config.socks5_username}:{config.socks5_password}@{config.socks5_ip}:{config.socks5_port}"
-        return socks5_url
-    except AttributeError as e:
-        logger.error(f"AttributeError in get_socks5_url: {e}")
-        return ""
-    except Exception as e:
-        logger.error(f"Unexpected error in get_socks5_url: {e}")
-        return ""
+    return config.socks5_url
 
 def get_pnl(cur_cost: float, buy_cost: float) -> float:
     """
@@ -119,15 +91,7 @@ def get_pnl(cur_cost: float, buy_cost: float) -> float:
     """
 
     try:
-        pnl_percent = round(((cur_cost * 100) / buy_cost), 2)
-
-        if pnl_percent < 100:
-            pnl_percent = round((pnl_percent - 100), 2)
-
-        elif pnl_percent < 0:
-            pnl_percent = round((abs(pnl_percent) - 100), 2)
-
-        return pnl_percent
+        return round(cur_cost / buy_cost * 100.0 - 100.0, 2)
     except Exception as e:
         logger.error(f"Unexpected error in get_pnl: {e}")
         return 0.0
@@ -144,19 +108,16 @@ def simplify(data: Union[int, float, str], format: int = 0) -> str:
         str: The simplified number as a string.
     """
 
-    subscript_map = { 1: '₁', 2: '₂', 3: '₃', 4: '₄', 5:  '₅', 6: '₆', 7: '₇', 8: '₈', 9: '₉', 10: '₁₀' }
-
     try:
         if isinstance(data, str):
             data = float(data)
 
         if format == 0:
-            suffixes = ["", "K", "M", "B", "T"]
             magnitude = 0
-            while abs(data) >= 1000 and magnitude < len(suffixes) - 1:
-                magnitude += 1
-                data /= 1000.0
-            return f"{data:.2f}".rstrip('0').rstrip('.') + suffixes[magnitude]
+            if abs(data) >= 1000:
+                magnitude = min(int(math.log10(abs(data))) // 3, len(SUFFIXES) - 1)
+                data /= 1000.0 ** magnitude
+            return f"{data:.2f}".rstrip('0').rstrip('.') + SUFFIXES[magnitude]
 
         elif format == 1:
             data_str = f"{data:.20f}"
@@ -170,7 +131,7 @@ def simplify(data: Union[int, float, str], format: int = 0) -> str:
             if integer_part == '0':
                 leading_zeros = len(fractional_part) - len(fractional_part.lstrip('0'))
                 if leading_zeros > 0:
-                    subscript = subscript_map.get(leading_zeros, f"_{leading_zeros}")
+                    subscript = SUBSCRIPT_MAP.get(leading_zeros, f"_{leading_zeros}")
                     fractional_part = fractional_part.lstrip('0')[:4]
                     return f"0.0{subscript}{fractional_part}"
                 else:
@@ -230,6 +191,7 @@ def get_worth(config: Any, entry: Any) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Unexpected error in get_worth: {e}")
 
+@functools.lru_cache(maxsize=256)
 def format_datetime_msk(timestamp: int) -> str:
     """
     Convert a timestamp to a formatted datetime string in MSK (UTC+3).
@@ -327,11 +289,12 @@ def format_msg_report(worth: Dict[str, Any], entry: Dict[str, Any]) -> str:
         latest = entry.get('tokens', [])
         if latest:
             for item in latest:
-                name = f"{item['name']:<8}"
-                pnl_percent = f"{int(item['pnl_percent'])}%".rjust(8)
-                cur_cost = f"{int(item['cur_cost'])}$".rjust(8)
-                char = '🔴' if item['pnl_percent'] < 0 else '🟢'
-                body.append(f"<code>{char} {name} {pnl_percent} {cur_cost}</code>\n")
+                body.append(REPORT_ROW_TEMPLATE.format(
+                    char='🔴' if item['pnl_percent'] < 0 else '🟢',
+                    name=item['name'],
+                    pnl=int(item['pnl_percent']),
+                    cost=int(item['cur_cost'])
+                ))
         
         return header + ''.join(body)
     except Exception as e: